@@ -0,0 +1,213 @@
+import heapq
+import networkx as nx
+import pandas as pd
+from collections import deque
+
+
+def _edge_key(u, v):
+    return (u, v) if str(u) <= str(v) else (v, u)
+
+
+def build_order_steps(order_routes, G, aisles=None, speed=1.0, pick_time=10.0):
+    """
+    Expands the block routes from evaluate_solution into timed walking steps.
+
+    Each order becomes a tuple of (aisle_index, duration) steps: walking a
+    stretch of consecutive edges of the same aisle occupies that aisle for
+    their total weight / speed seconds, and every block visit adds a pick
+    step (aisle_index -1) that holds no aisle. Shortest paths come from one
+    Dijkstra run per distinct source block, and the steps of every leg are
+    expanded only once.
+
+    Args:
+        order_routes (dict): CustomerID -> [depot, block, ..., depot].
+        aisles (dict): Optional (u, v) edge -> aisle name. Edges that are not
+            listed form their own aisle named "u-v".
+
+    Returns:
+        tuple: (order_steps, aisle_names)
+    """
+    aisles = {_edge_key(u, v): a for (u, v), a in (aisles or {}).items()}
+    aisle_index = {}
+    route_cache = {}
+    path_cache = {}
+    leg_cache = {}
+
+    def aisle_of(u, v):
+        key = _edge_key(u, v)
+        name = aisles.get(key, f"{key[0]}-{key[1]}")
+        if name not in aisle_index:
+            aisle_index[name] = len(aisle_index)
+        return aisle_index[name]
+
+    def leg_steps(a, b):
+        if a not in path_cache:
+            _, path_cache[a] = nx.single_source_dijkstra(G, a, weight="weight")
+        path = path_cache[a][b]
+        steps = []
+        for u, v in zip(path[:-1], path[1:]):
+            aisle = aisle_of(u, v)
+            duration = G[u][v]["weight"] / speed
+            if steps and steps[-1][0] == aisle:
+                steps[-1] = (aisle, steps[-1][1] + duration)
+            else:
+                steps.append((aisle, duration))
+        return tuple(steps)
+
+    order_steps = {}
+    for cust, route in order_routes.items():
+        route = tuple(route)
+        if route not in route_cache:
+            steps = []
+            for a, b in zip(route[:-1], route[1:]):
+                if (a, b) not in leg_cache:
+                    leg_cache[(a, b)] = leg_steps(a, b)
+                steps.extend(leg_cache[(a, b)])
+                if b != route[-1]:
+                    steps.append((-1, pick_time))
+            route_cache[route] = tuple(steps)
+        order_steps[cust] = route_cache[route]
+
+    aisle_names = sorted(aisle_index, key=aisle_index.get)
+    return order_steps, aisle_names
+
+
+def simulate_congestion(order_routes, G, n_pickers=5, aisle_capacity=1, aisles=None,
+                        speed=1.0, pick_time=10.0, release_times=None, order_sequence=None):
+    """
+    Discrete-event simulation of several pickers sharing the warehouse aisles.
+
+    Pickers take orders from a common queue and walk their routes edge by
+    edge. An aisle holds at most its capacity of pickers at once; a picker
+    that finds it full waits at the node (FIFO) until someone leaves. A
+    picker only holds the aisle it is currently walking, so the simulation
+    cannot deadlock.
+
+    Args:
+        order_routes (dict): CustomerID -> route, as returned by evaluate_solution.
+        aisle_capacity (int or dict): Pickers allowed per aisle at the same
+            time, either one value for all aisles or aisle name -> capacity
+            (unlisted aisles default to 1).
+        speed (float): Walking speed in distance units per second.
+        pick_time (float): Seconds spent at every visited block.
+        release_times (dict): Optional CustomerID -> time (s) at which the
+            order becomes available. By default all orders are available at 0.
+        order_sequence (list): Order in which customers are dispatched
+            (defaults to the iteration order of order_routes).
+
+    Returns:
+        dict: Orders completed, makespan (s), throughput (orders per hour),
+            waiting time totals and a per-aisle DataFrame.
+    """
+    order_steps, aisle_names = build_order_steps(order_routes, G, aisles, speed, pick_time)
+    sequence = list(order_sequence) if order_sequence is not None else list(order_routes)
+    if release_times:
+        sequence.sort(key=lambda c: release_times.get(c, 0))
+
+    if isinstance(aisle_capacity, dict):
+        capacity = [aisle_capacity.get(a, 1) for a in aisle_names]
+    else:
+        capacity = [aisle_capacity] * len(aisle_names)
+
+    n_aisles = len(aisle_names)
+    occupancy = [0] * n_aisles
+    busy_time = [0.0] * n_aisles
+    wait_time = [0.0] * n_aisles
+    traversals = [0] * n_aisles
+    waiting = [deque() for _ in range(n_aisles)]
+
+    picker_steps = [()] * n_pickers
+    picker_pos = [0] * n_pickers
+    picker_aisle = [-1] * n_pickers
+    picker_wait = [0.0] * n_pickers
+    order_waits = []
+
+    events = []
+    seq = 0
+    next_order = 0
+    completed = 0
+    now = 0.0
+
+    def start_next_order(p, t):
+        nonlocal next_order, seq
+        if next_order >= len(sequence):
+            return
+        cust = sequence[next_order]
+        next_order += 1
+        picker_steps[p] = order_steps[cust]
+        picker_pos[p] = 0
+        picker_wait[p] = 0.0
+        release = release_times.get(cust, 0) if release_times else 0
+        heapq.heappush(events, (max(t, release), seq, p))
+        seq += 1
+
+    for p in range(n_pickers):
+        start_next_order(p, 0.0)
+
+    while events:
+        now, _, p = heapq.heappop(events)
+
+        # Leave the aisle just walked and let the next waiting picker in
+        held = picker_aisle[p]
+        if held >= 0:
+            picker_aisle[p] = -1
+            occupancy[held] -= 1
+            if waiting[held]:
+                q, since = waiting[held].popleft()
+                delay = now - since
+                wait_time[held] += delay
+                picker_wait[q] += delay
+                occupancy[held] += 1
+                picker_aisle[q] = held
+                duration = picker_steps[q][picker_pos[q] - 1][1]
+                busy_time[held] += duration
+                heapq.heappush(events, (now + duration, seq, q))
+                seq += 1
+
+        steps = picker_steps[p]
+        pos = picker_pos[p]
+        if pos >= len(steps):
+            completed += 1
+            order_waits.append(picker_wait[p])
+            start_next_order(p, now)
+            continue
+
+        aisle, duration = steps[pos]
+        picker_pos[p] = pos + 1
+        if aisle < 0:
+            heapq.heappush(events, (now + duration, seq, p))
+            seq += 1
+        elif occupancy[aisle] < capacity[aisle]:
+            occupancy[aisle] += 1
+            traversals[aisle] += 1
+            picker_aisle[p] = aisle
+            busy_time[aisle] += duration
+            heapq.heappush(events, (now + duration, seq, p))
+            seq += 1
+        else:
+            traversals[aisle] += 1
+            waiting[aisle].append((p, now))
+
+    makespan = now
+    aisle_stats = pd.DataFrame({
+        "Aisle": aisle_names,
+        "Capacity": capacity,
+        "Traversals": traversals,
+        "BusyTime": busy_time,
+        "Utilisation": [
+            busy_time[a] / (capacity[a] * makespan) if makespan and capacity[a] else 0.0
+            for a in range(n_aisles)
+        ],
+        "WaitTime": wait_time,
+    })
+
+    total_wait = sum(order_waits)
+    return {
+        "orders": completed,
+        "makespan": makespan,
+        "throughput_per_hour": completed / makespan * 3600 if makespan else 0.0,
+        "total_wait": total_wait,
+        "mean_wait_per_order": total_wait / completed if completed else 0.0,
+        "max_wait_per_order": max(order_waits) if order_waits else 0.0,
+        "aisles": aisle_stats,
+    }
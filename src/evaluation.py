@@ -1,44 +1,127 @@
 import networkx as nx
-import re
 from collections import defaultdict
+from order_store import as_order_store
 
-def natural_keys(text):
-    '''
-    alist.sort(key=natural_keys) sorts in human order
-    http://nedbatchelder.com/blog/200712/human_sorting.html
-    '''
-    return [int(c) if c.isdigit() else c for c in re.split(r'(\d+)', str(text))]
 
+def make_distance_lookup(G):
+    """
+    Returns dist(u, v): shortest path length on G, caching one Dijkstra run per source.
+    """
+    cache = {}
+
+    def dist(u, v):
+        if u not in cache:
+            cache[u] = nx.single_source_dijkstra_path_length(G, u, weight="weight")
+        return cache[u][v]
+
+    return dist
 
-def evaluate_solution(block_assignment, orders_df, item_sizes, item_weight, item_total_demand, G, depot, block_capacity=60):
+
+def initial_block_inventory(block_assignment, item_sizes, block_capacity=60):
     """
-    Evaluates the block assignment based on Walking Distance and Handling Effort.
+    Units of the assigned item that fit in each block (a full block).
     """
-    
-    # Calculate block inventory (how many items fit in a block)
-    block_inventory_template = {}
+    block_inventory = {}
     for block, item in block_assignment.items():
         # Avoid division by zero if size is somehow 0, though unlikely
         size = item_sizes.get(item, 1)
         count = int(block_capacity / size) if size > 0 else 0
-        block_inventory_template[block] = count
+        block_inventory[block] = count
+    return block_inventory
 
-    item_to_blocklist = defaultdict(list)
-    for block, item in block_assignment.items():
-        item_to_blocklist[item].append(block)
 
-    def get_sorted_blocks_for_item(item, current_inventory, amount_needed):
+def pick_order(item_amounts, item_to_blocklist, inventory, item_weight, dist, depot):
+    """
+    Picks one order from the blocks, depleting inventory in place.
+
+    Returns:
+        tuple: (blocks_visited, effort, unfilled)
+            blocks_visited (list): Blocks picked from (may repeat).
+            effort (float): Sum of item weight * amount * distance from depot.
+            unfilled (dict): Item -> amount that could not be picked,
+                including items that have no block at all.
+    """
+    blocks_visited = []
+    effort = 0
+    unfilled = {}
+
+    for item, amount_needed in item_amounts.items():
+        if item not in item_to_blocklist:
+            # Item not placed
+            unfilled[item] = amount_needed
+            continue
+
         # Sort blocks:
         # 1. Primary: Can fulfill entire amount? (0 = Yes, 1 = No) - "One Stop" preference
         # 2. Secondary: Distance to depot (Ascending)
-        blocks = item_to_blocklist[item]
-        return sorted(
-            blocks,
+        sorted_blocks = sorted(
+            item_to_blocklist[item],
             key=lambda b: (
-                0 if current_inventory[b] >= amount_needed else 1,
-                nx.shortest_path_length(G, depot, b, weight="weight"),
+                0 if inventory[b] >= amount_needed else 1,
+                dist(depot, b),
             ),
         )
+        w_i = item_weight.get(item, 0)
+
+        for block in sorted_blocks:
+            if amount_needed <= 0:
+                break
+            available = inventory.get(block, 0)
+            if available == 0:
+                continue
+
+            take = min(amount_needed, available)
+            inventory[block] -= take
+            amount_needed -= take
+            blocks_visited.append(block)
+
+            # Handling Effort (Simple Definition)
+            # Sum of (Item Weight * Amount * Distance to Assigned Block)
+            effort += w_i * take * dist(depot, block)
+
+        if amount_needed > 0:
+            unfilled[item] = amount_needed
+
+    return blocks_visited, effort, unfilled
+
+
+def nearest_neighbor_route(blocks_visited, dist, depot):
+    """
+    Builds a depot -> blocks -> depot route with the Nearest Neighbor heuristic.
+
+    Returns:
+        tuple: (route, distance)
+    """
+    if not blocks_visited:
+        return [depot, depot], 0
+
+    unique_blocks = set(blocks_visited)
+    route = [depot]
+    current_loc = depot
+
+    while unique_blocks:
+        nearest_block = min(unique_blocks, key=lambda b: dist(current_loc, b))
+        route.append(nearest_block)
+        unique_blocks.remove(nearest_block)
+        current_loc = nearest_block
+
+    route.append(depot)
+    distance = sum(dist(route[i], route[i + 1]) for i in range(len(route) - 1))
+    return route, distance
+
+
+def evaluate_solution(block_assignment, orders, item_sizes, item_weight, item_total_demand, G, depot, block_capacity=60):
+    """
+    Evaluates the block assignment based on Walking Distance and Handling Effort.
+    orders can be an OrderStore or an orders DataFrame.
+    """
+    store = as_order_store(orders)
+    dist = make_distance_lookup(G)
+    block_inventory_template = initial_block_inventory(block_assignment, item_sizes, block_capacity)
+
+    item_to_blocklist = defaultdict(list)
+    for block, item in block_assignment.items():
+        item_to_blocklist[item].append(block)
 
     # 1. Total Walking Distance & Picking Effort
     total_distance = 0
@@ -50,82 +133,20 @@ def evaluate_solution(block_assignment, orders_df, item_sizes, item_weight, item
     # Reset inventory for simulation
     simulation_inventory = block_inventory_template.copy()
     
-    # Reset inventory for simulation
-    simulation_inventory = block_inventory_template.copy()
-    
-    # Sort customers naturally (P1, P2, ... P10)
-    grouped_orders = orders_df.groupby("CustomerID")
-    sorted_customers = sorted(grouped_orders.groups.keys(), key=natural_keys)
-
-    for cust in sorted_customers:
-        group = grouped_orders.get_group(cust)
-
-        item_amounts = group.groupby("ItemID")["Amount"].sum().to_dict()
-        blocks_visited = []
-        picked_at_block = defaultdict(float) # Track weight picked at each block
-        current_order_effort = 0
-        
-        for item, amount_needed in item_amounts.items():
-            if item not in item_to_blocklist:
-                # Item not placed
-                continue
-                
-            sorted_blocks = get_sorted_blocks_for_item(item, simulation_inventory, amount_needed)
-            w_i = item_weight.get(item, 0)
-            
-            for block in sorted_blocks:
-                if amount_needed <= 0:
-                    break
-                available = simulation_inventory.get(block, 0)
-                if available == 0:
-                    continue
-                
-                take = min(amount_needed, available)
-                simulation_inventory[block] -= take
-                amount_needed -= take
-                blocks_visited.append(block)
-                
-                # Accumulate weight picked at this block (not needed for simple effort, but good for debug if needed)
-                # picked_at_block[block] += take * w_i
-                
-                # Handling Effort (Simple Definition)
-                # Sum of (Item Weight * Amount * Distance to Assigned Block)
-                dist_to_depot = nx.shortest_path_length(G, depot, block, weight="weight")
-                current_order_effort += w_i * take * dist_to_depot
+    # Customers are stored in natural order (P1, P2, ... P10)
+    for cust, item_amounts in store.baskets():
+        blocks_visited, current_order_effort, _ = pick_order(
+            item_amounts, item_to_blocklist, simulation_inventory, item_weight, dist, depot
+        )
 
         order_efforts[cust] = current_order_effort
         total_handling_effort += current_order_effort
 
-        if not blocks_visited:
-            order_distances[cust] = 0
-            order_routes[cust] = [depot, depot]
-            continue
-            
         # Optimize route: Nearest Neighbor TSP
-        unique_blocks = set(blocks_visited)
-        route = [depot]
-        current_loc = depot
-        
-        while unique_blocks:
-            nearest_block = min(
-                unique_blocks, 
-                key=lambda b: nx.shortest_path_length(G, current_loc, b, weight="weight")
-            )
-            route.append(nearest_block)
-            unique_blocks.remove(nearest_block)
-            current_loc = nearest_block
-            
-        route.append(depot)
+        route, distance = nearest_neighbor_route(blocks_visited, dist, depot)
         order_routes[cust] = route
-        
-        # Calculate Distance (TSP Optimized)
-        dist = sum(
-            nx.shortest_path_length(G, route[i], route[i + 1], weight="weight")
-            for i in range(len(route) - 1)
-        )
-            
-        order_distances[cust] = dist
-        total_distance += dist
+        order_distances[cust] = distance
+        total_distance += distance
 
     # Handling Effort is now the sum of per-order efforts (Simple Formula)
             
@@ -2,11 +2,12 @@ import os
 import os
 import yaml
 import json
-import re
 import pandas as pd
 from warehouse_graph import build_warehouse_graph
 from preprocess import load_data, compute_demand_metrics, build_cooccurrence_matrix
+from order_store import build_order_store, natural_keys
 from algorithm import place_items_by_lsc
+from zoning import place_items_by_zone
 from evaluation import evaluate_solution
 
 # Path Configuration
@@ -33,14 +34,6 @@ def load_config():
         return yaml.safe_load(f)
 
 
-def natural_keys(text):
-    '''
-    alist.sort(key=natural_keys) sorts in human order
-    http://nedbatchelder.com/blog/200712/human_sorting.html
-    '''
-    return [int(c) if c.isdigit() else c for c in re.split(r'(\d+)', str(text))]
-
-
 def main():
     print("------------------------------------------------------------")
     print("Warehouse Item Placement Optimization")
@@ -55,6 +48,8 @@ def main():
     block_capacity = params.get("block_capacity", 60)
     pps_weights = params.get("pps_weights", {"w_freq": 0.5, "w_cooc": 0.5})
     lsc_weights = params.get("lsc_weights", {"w_depot": 0.5, "w_affinity": 0.5})
+    zoning = params.get("zoning") or {}
+    n_zones = zoning.get("n_zones", 1)
     
     # Extract layout
     layout_data = config.get("layout", {})
@@ -73,16 +68,16 @@ def main():
 
     # 3. Preprocess
     print(f"[3/5] Computing metrics and co-occurrence...")
+    order_store = build_order_store(orders_df)
+    print(f"      Customers: {order_store.n_customers}, Order lines: {len(order_store.item_idx)}")
     item_demand_freq, item_total_inventory, item_blocks_required, item_sizes, item_weight = \
-        compute_demand_metrics(orders_df, item_info_df, inventory_df, block_capacity)
+        compute_demand_metrics(order_store, item_info_df, inventory_df, block_capacity)
     
-    cooc_matrix = build_cooccurrence_matrix(orders_df)
+    cooc_matrix = build_cooccurrence_matrix(order_store)
     
     # 4. Run Algorithm
-    print(f"[4/5] Running PPS + LCS placement algorithm...")
     items = list(item_demand_freq.keys())
-    
-    block_assignment, placed_blocks = place_items_by_lsc(
+    placement_args = dict(
         items=items,
         demand=item_demand_freq,
         weight=item_weight,
@@ -94,13 +89,25 @@ def main():
         pps_weights=pps_weights,
         lsc_weights=lsc_weights
     )
+
+    if n_zones > 1:
+        print(f"[4/5] Running zoned PPS + LCS placement ({n_zones} zones)...")
+        block_assignment, placed_blocks = place_items_by_zone(
+            **placement_args,
+            n_zones=n_zones,
+            max_workers=zoning.get("max_workers"),
+            seed=zoning.get("seed")
+        )
+    else:
+        print(f"[4/5] Running PPS + LCS placement algorithm...")
+        block_assignment, placed_blocks = place_items_by_lsc(**placement_args)
     print(f"      Placed {len(block_assignment)} blocks.")
 
     # 5. Evaluate
     print(f"[5/5] Evaluating solution...")
     total_dist, handling_effort, order_distances, order_efforts, order_routes = evaluate_solution(
         block_assignment, 
-        orders_df, 
+        order_store, 
         item_sizes, 
         item_weight, 
         item_total_inventory, 
@@ -117,8 +124,8 @@ def main():
         print(f"{item:<10} {item_total_inventory[item]:<15} {item_blocks_required.get(item, 0):<15}")
 
     print("\n>>> 2. Co-occurrence Matrix (Top 10 pairs)")
-    # Sort by frequency desc
-    sorted_cooc = sorted(cooc_matrix.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Sort by frequency desc, then by pair so ties are listed deterministically
+    sorted_cooc = sorted(cooc_matrix.items(), key=lambda x: (-x[1], x[0]))[:10]
     for (i, j), val in sorted_cooc:
         print(f"({i}, {j}): {val}")
 
@@ -0,0 +1,158 @@
+import re
+import numpy as np
+import pandas as pd
+
+
+def natural_keys(text):
+    '''
+    alist.sort(key=natural_keys) sorts in human order
+    http://nedbatchelder.com/blog/200712/human_sorting.html
+    '''
+    return [int(c) if c.isdigit() else c for c in re.split(r'(\d+)', str(text))]
+
+
+class OrderStore:
+    """
+    Columnar, integer-coded view of the orders, built once and shared by all stages.
+
+    Customers are kept in natural order (P1, P2, ..., P10) and items in sorted
+    order. Customer c's lines span indptr[c]:indptr[c + 1] of the line
+    arrays, with one line per (customer, item):
+
+        item_idx: item code of the line
+        amounts:  total amount of that item ordered by the customer
+        lines:    number of raw order rows aggregated into the line
+
+    item_rows and item_amounts hold the number of raw rows and the total
+    amount of every item over the whole DataFrame, including rows without a
+    CustomerID that belong to no basket. They are None on a subset (take).
+    """
+
+    def __init__(self, customers, items, indptr, item_idx, amounts, lines, item_rows=None, item_amounts=None):
+        self.customers = customers
+        self.items = items
+        self.indptr = indptr
+        self.item_idx = item_idx
+        self.amounts = amounts
+        self.lines = lines
+        self.item_rows = item_rows
+        self.item_amounts = item_amounts
+
+    @property
+    def n_customers(self):
+        return len(self.customers)
+
+    @property
+    def n_items(self):
+        return len(self.items)
+
+    def baskets(self):
+        """
+        Iterates (CustomerID, {ItemID: Amount}) in natural customer order.
+        """
+        items = self.items
+        ptr = self.indptr.tolist()
+        idx = self.item_idx.tolist()
+        amt = self.amounts.tolist()
+        for c, cust in enumerate(self.customers):
+            yield cust, {items[idx[k]]: amt[k] for k in range(ptr[c], ptr[c + 1])}
+
+    def item_totals(self, values=None):
+        """
+        Sums a per-line array (amounts by default) per item code.
+        """
+        values = self.amounts if values is None else values
+        totals = np.zeros(self.n_items, dtype=values.dtype)
+        np.add.at(totals, self.item_idx, values)
+        return totals
+
+    def take(self, customer_indices):
+        """
+        Returns a new store restricted to the given customer positions (kept in the given order).
+        """
+        customer_indices = np.asarray(customer_indices, dtype=np.int64)
+        starts = self.indptr[customer_indices]
+        lengths = self.indptr[customer_indices + 1] - starts
+        line_pos = (
+            np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+            + np.arange(lengths.sum())
+        )
+        return OrderStore(
+            customers=[self.customers[c] for c in customer_indices.tolist()],
+            items=self.items,
+            indptr=np.concatenate(([0], np.cumsum(lengths))),
+            item_idx=self.item_idx[line_pos],
+            amounts=self.amounts[line_pos],
+            lines=self.lines[line_pos],
+        )
+
+    def unique_baskets(self, with_amounts=False):
+        """
+        Deduplicates identical baskets.
+
+        Two customers share a basket when they order the same set of items
+        (and, if with_amounts, the same amount of each).
+
+        Returns:
+            tuple: (representatives, multiplicities)
+                representatives (np.ndarray): First customer position of each distinct basket.
+                multiplicities (np.ndarray): Number of customers with that basket.
+        """
+        ptr = self.indptr.tolist()
+        idx = self.item_idx.tolist()
+        amt = self.amounts.tolist() if with_amounts else None
+
+        first_seen = {}
+        counts = []
+        representatives = []
+        for c in range(self.n_customers):
+            key = tuple(idx[ptr[c]:ptr[c + 1]])
+            if with_amounts:
+                key = (key, tuple(amt[ptr[c]:ptr[c + 1]]))
+            b = first_seen.get(key)
+            if b is None:
+                first_seen[key] = len(counts)
+                representatives.append(c)
+                counts.append(1)
+            else:
+                counts[b] += 1
+        return np.array(representatives, dtype=np.int64), np.array(counts, dtype=np.int64)
+
+
+def build_order_store(orders_df):
+    """
+    Builds the OrderStore from a CustomerID / ItemID / Amount DataFrame.
+    """
+    per_item = orders_df.groupby("ItemID")["Amount"].agg(["sum", "size"])
+    agg = orders_df.groupby(["CustomerID", "ItemID"], sort=False)["Amount"].agg(["sum", "size"])
+    cust_values = agg.index.get_level_values(0)
+    item_values = agg.index.get_level_values(1)
+
+    # Plain sort first so that ties under natural_keys (P1 / P01) keep a fixed order
+    customers = sorted(sorted(pd.unique(cust_values)), key=natural_keys)
+    cust_rank = {cust: c for c, cust in enumerate(customers)}
+    cust_idx = np.array([cust_rank[c] for c in cust_values], dtype=np.int64)
+    item_idx = per_item.index.get_indexer(item_values)
+
+    order = np.lexsort((item_idx, cust_idx))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(cust_idx, minlength=len(customers)))))
+
+    return OrderStore(
+        customers=customers,
+        items=list(per_item.index),
+        indptr=indptr,
+        item_idx=item_idx[order].astype(np.int64),
+        amounts=agg["sum"].to_numpy()[order],
+        lines=agg["size"].to_numpy()[order],
+        item_rows=per_item["size"].to_numpy(),
+        item_amounts=per_item["sum"].to_numpy(),
+    )
+
+
+def as_order_store(orders):
+    """
+    Accepts either an OrderStore or an orders DataFrame.
+    """
+    if isinstance(orders, OrderStore):
+        return orders
+    return build_order_store(orders)
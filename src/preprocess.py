@@ -3,6 +3,7 @@ import numpy as np
 from itertools import combinations
 from collections import defaultdict
 import os
+from order_store import as_order_store
 
 def load_data(orders_path, item_info_path, inventory_path=None):
     """
@@ -28,24 +29,30 @@ def load_data(orders_path, item_info_path, inventory_path=None):
             
     return orders_df, item_info_df, inventory_df
 
-def compute_demand_metrics(orders_df, item_info_df, inventory_df, block_capacity=60):
+def compute_demand_metrics(orders, item_info_df, inventory_df, block_capacity=60):
     """
     Computes demand metrics required for the algorithm.
+    orders can be an OrderStore or an orders DataFrame.
     inventory_df overrides order demand for block calculation and handling effort.
     """
+    store = as_order_store(orders)
+
     # Convert to dictionaries
     item_sizes = item_info_df.set_index("ItemID")["Size"].to_dict()
     item_weight = item_info_df.set_index("ItemID")["Weight"].to_dict()
     
     # Frequency and co-occurrence still come from orders (historical data)
-    item_demand_freq = orders_df.groupby("ItemID").size().to_dict()
+    # Raw per-item totals also count rows without a CustomerID
+    item_rows = store.item_rows if store.item_rows is not None else store.item_totals(store.lines)
+    item_demand_freq = dict(zip(store.items, item_rows.tolist()))
     
     # If inventory is provided, use it for total quantity (blocks needed) and effort
     if inventory_df is not None:
         item_total_inventory = inventory_df.set_index("ItemID")["Amount"].to_dict()
     else:
         # Fallback to orders if no inventory file (backward compatibility/legacy mode)
-        item_total_inventory = orders_df.groupby("ItemID")["Amount"].sum().to_dict()
+        item_amounts = store.item_amounts if store.item_amounts is not None else store.item_totals()
+        item_total_inventory = dict(zip(store.items, item_amounts.tolist()))
     
     # Calculate blocks required based on INVENTORY
     item_blocks_required = {}
@@ -72,17 +79,22 @@ def compute_demand_metrics(orders_df, item_info_df, inventory_df, block_capacity
             
     return item_demand_freq, item_total_inventory, item_blocks_required, item_sizes, item_weight
 
-def build_cooccurrence_matrix(orders_df):
+def build_cooccurrence_matrix(orders):
     """
     Builds the co-occurrence matrix for items in orders.
+    Identical baskets are counted once and weighted by how often they occur.
     """
-    grouped_orders = orders_df.groupby("CustomerID")
+    store = as_order_store(orders)
+    ptr = store.indptr.tolist()
+    idx = store.item_idx.tolist()
+    representatives, multiplicities = store.unique_baskets()
+
     co_occurrence = defaultdict(lambda: defaultdict(int))
-    for _, group in grouped_orders:
-        items = group["ItemID"].unique()
+    for c, count in zip(representatives.tolist(), multiplicities.tolist()):
+        items = [store.items[k] for k in idx[ptr[c]:ptr[c + 1]]]
         for i, j in combinations(items, 2):
-            co_occurrence[i][j] += 1
-            co_occurrence[j][i] += 1
+            co_occurrence[i][j] += count
+            co_occurrence[j][i] += count
             
     co_occurrence_pairs = {
         (i, j): co_occurrence[i][j] for i in co_occurrence for j in co_occurrence[i]
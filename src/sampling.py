@@ -0,0 +1,308 @@
+import math
+import numpy as np
+from collections import defaultdict
+from statistics import NormalDist
+from evaluation import evaluate_solution, make_distance_lookup, initial_block_inventory, pick_order, nearest_neighbor_route
+from order_store import as_order_store
+
+
+def build_strata(store, a_share=0.8, b_share=0.95):
+    """
+    Assigns every customer to a stratum by basket size and demand class.
+
+    Items are ranked by order frequency and split into classes A / B / C at
+    the a_share and b_share cumulative-frequency cut-offs; a basket takes the
+    best class among its items. Basket sizes are bucketed by powers of two
+    (1, 2-3, 4-7, ...).
+
+    Returns:
+        np.ndarray: Stratum label per customer position.
+    """
+    freq = store.item_totals(store.lines).astype(float)
+    ranked = np.argsort(-freq, kind="stable")
+    cumulative = np.cumsum(freq[ranked]) / freq.sum() if freq.sum() else np.ones(len(freq))
+    item_class = np.empty(store.n_items, dtype=np.int64)
+    item_class[ranked] = np.where(cumulative <= a_share, 0, np.where(cumulative <= b_share, 1, 2))
+    # The most frequent item is always class A, even if it alone exceeds a_share
+    if len(ranked):
+        item_class[ranked[0]] = 0
+
+    sizes = np.diff(store.indptr)
+    size_bucket = np.floor(np.log2(sizes)).astype(np.int64)
+    basket_class = np.minimum.reduceat(item_class[store.item_idx], store.indptr[:-1])
+    return size_bucket * 3 + basket_class
+
+
+def build_demand_index(store):
+    """
+    Per-item running demand over customers in natural order, used by demand_before.
+
+    Returns:
+        tuple: (keys, cumulative, item_start) where keys are the lines sorted by
+            (item, customer) encoded as item * n_customers + customer.
+    """
+    n = store.n_customers
+    line_customer = np.repeat(np.arange(n), np.diff(store.indptr))
+    order = np.lexsort((line_customer, store.item_idx))
+    keys = store.item_idx[order] * n + line_customer[order]
+    cumulative = np.concatenate(([0], np.cumsum(store.amounts[order])))
+    item_start = np.searchsorted(keys, np.arange(store.n_items) * n)
+    return keys, cumulative, item_start
+
+
+def demand_before(store, customer_indices, demand_index=None):
+    """
+    Amount of each line's item ordered by all customers before that line's customer.
+
+    Args:
+        customer_indices (np.ndarray): Customer positions in ascending order.
+        demand_index (tuple): Optional build_demand_index(store) result to reuse.
+
+    Returns:
+        np.ndarray: One value per line of store.take(customer_indices).
+    """
+    keys, cumulative, item_start = demand_index or build_demand_index(store)
+    sample = store.take(customer_indices)
+    sample_customer = np.repeat(np.asarray(customer_indices), np.diff(sample.indptr))
+    position = np.searchsorted(keys, sample.item_idx * store.n_customers + sample_customer)
+    return cumulative[position] - cumulative[item_start[sample.item_idx]]
+
+
+def simulate_customers(block_assignment, store, customer_indices, item_sizes, item_weight, G, depot,
+                       block_capacity=60, demand_index=None, dist=None):
+    """
+    Runs the evaluate_solution picking for a subset of customers.
+
+    In the full sequential run every line takes min(needed, remaining), so
+    an item's stock left for customer k is exactly its full stock minus
+    everything ordered before k. Each sampled customer is therefore picked
+    against that stock, drained from the item's blocks nearest to the depot
+    first (the only approximation). Customers do not depend on each other,
+    so any subset can be simulated, and results can be reused as the
+    sample grows.
+
+    demand_index and dist (a make_distance_lookup(G) function) can be passed
+    in to share them across calls.
+
+    Returns:
+        tuple: (distances, efforts) arrays aligned with sorted(customer_indices).
+    """
+    customer_indices = np.sort(np.asarray(customer_indices, dtype=np.int64))
+    sample = store.take(customer_indices)
+    before = demand_before(store, customer_indices, demand_index).tolist()
+    ptr = sample.indptr.tolist()
+    idx = sample.item_idx.tolist()
+
+    dist = dist or make_distance_lookup(G)
+    full_inventory = initial_block_inventory(block_assignment, item_sizes, block_capacity)
+
+    item_to_blocklist = defaultdict(list)
+    for block, item in block_assignment.items():
+        item_to_blocklist[item].append(block)
+    blocks_by_distance = {
+        item: sorted(item_blocks, key=lambda b: dist(depot, b)) for item, item_blocks in item_to_blocklist.items()
+    }
+
+    distances = np.zeros(sample.n_customers)
+    efforts = np.zeros(sample.n_customers)
+    for c, (_, item_amounts) in enumerate(sample.baskets()):
+        inventory = {}
+        for line in range(ptr[c], ptr[c + 1]):
+            used = before[line]
+            for block in blocks_by_distance.get(store.items[idx[line]], ()):
+                drained = min(used, full_inventory[block])
+                inventory[block] = full_inventory[block] - drained
+                used -= drained
+
+        blocks_visited, efforts[c], _ = pick_order(
+            item_amounts, item_to_blocklist, inventory, item_weight, dist, depot
+        )
+        _, distances[c] = nearest_neighbor_route(blocks_visited, dist, depot)
+    return distances, efforts
+
+
+def stratified_total(values, labels, stratum_sizes, confidence=0.95):
+    """
+    Stratified estimate of a population total with a normal confidence interval.
+
+    Args:
+        values (np.ndarray): Per-customer values of the sample.
+        labels (np.ndarray): Stratum label of each sampled customer.
+        stratum_sizes (dict): Stratum label -> number of customers in the population.
+
+    Returns:
+        tuple: (estimate, (low, high))
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    total = 0.0
+    variance = 0.0
+    for h, N_h in stratum_sizes.items():
+        v = values[labels == h]
+        n_h = len(v)
+        if n_h == 0:
+            continue
+        total += N_h * v.mean()
+        if n_h > 1:
+            variance += N_h ** 2 * (1 - n_h / N_h) * v.var(ddof=1) / n_h
+    half_width = z * math.sqrt(variance)
+    return float(total), (float(total - half_width), float(total + half_width))
+
+
+class _StratifiedSampler:
+    """Nested stratified samples: a larger fraction always contains the smaller ones."""
+
+    def __init__(self, strata, seed=None):
+        rng = np.random.default_rng(seed)
+        self.members = {int(h): rng.permutation(np.flatnonzero(strata == h)) for h in np.unique(strata)}
+        self.sizes = {h: len(m) for h, m in self.members.items()}
+
+    def sample(self, fraction):
+        chosen = []
+        for h, members in self.members.items():
+            N_h = len(members)
+            n_h = min(N_h, max(math.ceil(fraction * N_h), min(2, N_h)))
+            chosen.append(members[:n_h])
+        return np.sort(np.concatenate(chosen))
+
+
+def estimate_solution(block_assignment, orders, item_sizes, item_weight, G, depot, block_capacity=60,
+                      fraction=0.05, confidence=0.95, seed=None):
+    """
+    Estimates the evaluate_solution totals from a stratified customer sample.
+
+    Returns:
+        dict: Sampled customer count and fraction, and for Distance and
+            Effort the estimated total with its confidence interval.
+    """
+    store = as_order_store(orders)
+    strata = build_strata(store)
+    sampler = _StratifiedSampler(strata, seed)
+    sample = sampler.sample(fraction)
+
+    distances, efforts = simulate_customers(
+        block_assignment, store, sample, item_sizes, item_weight, G, depot, block_capacity
+    )
+    labels = strata[sample]
+
+    result = {"customers": len(sample), "fraction": len(sample) / store.n_customers}
+    for name, values in (("Distance", distances), ("Effort", efforts)):
+        estimate, ci = stratified_total(values, labels, sampler.sizes, confidence)
+        result[name] = {"estimate": estimate, "ci": ci}
+    return result
+
+
+def check_estimate(block_assignment, orders, item_sizes, item_weight, item_total_demand, G, depot,
+                   block_capacity=60, fraction=0.05, confidence=0.95, seed=None):
+    """
+    Runs estimate_solution and evaluate_solution on the same inputs.
+
+    Useful to validate the sampling on a representative history before
+    relying on it, especially when stock is tight.
+
+    Returns:
+        dict: estimate_solution output with, per metric, the exact total
+            and whether the confidence interval covers it.
+    """
+    store = as_order_store(orders)
+    result = estimate_solution(
+        block_assignment, store, item_sizes, item_weight, G, depot, block_capacity, fraction, confidence, seed
+    )
+    exact_distance, exact_effort, *_ = evaluate_solution(
+        block_assignment, store, item_sizes, item_weight, item_total_demand, G, depot, block_capacity
+    )
+    for name, exact in (("Distance", exact_distance), ("Effort", exact_effort)):
+        low, high = result[name]["ci"]
+        result[name]["exact"] = exact
+        result[name]["covered"] = low <= exact <= high
+    return result
+
+
+def compare_solutions(assignment_a, assignment_b, orders, item_sizes, item_weight, G, depot, block_capacity=60,
+                      metrics=("Distance", "Effort"), initial_fraction=0.01, max_fraction=0.2, growth=2.0,
+                      confidence=0.95, seed=None):
+    """
+    Paired, adaptive comparison of two layouts on the same customer sample.
+
+    Both layouts are simulated on the same stratified sample and the per-
+    customer differences (A - B) are used to estimate the difference in
+    totals. The sample grows by the growth factor until the confidence
+    interval of every requested metric excludes zero. A zero-width interval
+    at zero (e.g. no sampled customer orders the items the layouts differ
+    on) does not settle anything, so sampling goes on. Samples are nested
+    and customers are simulated independently, so each round only
+    simulates the newly added customers.
+
+    Because the data is looked at after every round, the error rate is
+    split (Bonferroni) over the planned rounds and the requested metrics,
+    so the overall level stays at confidence. The comparison stops early
+    as unresolved ("futile") when even the largest difference inside the
+    current interval could not be resolved at max_fraction. If some
+    interval still contains zero at max_fraction, it stops with
+    "no_difference": no difference is detectable within that budget.
+
+    Returns:
+        dict: Rounds, customers and fraction used, why it stopped
+            ("resolved", "futile" or "no_difference"), whether every metric
+            has a better layout, and per metric the estimated difference
+            (A - B), its confidence interval and the better layout ("A",
+            "B" or None).
+    """
+    store = as_order_store(orders)
+    strata = build_strata(store)
+    sampler = _StratifiedSampler(strata, seed)
+    N = store.n_customers
+
+    planned_rounds = 1
+    if max_fraction > initial_fraction:
+        planned_rounds += math.ceil(math.log(max_fraction / initial_fraction) / math.log(growth))
+    round_confidence = 1 - (1 - confidence) / (planned_rounds * len(metrics))
+
+    demand_index = build_demand_index(store)
+    dist = make_distance_lookup(G)
+    differences = {"Distance": np.full(N, np.nan), "Effort": np.full(N, np.nan)}
+    fraction = initial_fraction
+    rounds = 0
+    while True:
+        rounds += 1
+        sample = sampler.sample(fraction)
+        new = sample[np.isnan(differences["Distance"][sample])]
+        dist_a, effort_a = simulate_customers(
+            assignment_a, store, new, item_sizes, item_weight, G, depot, block_capacity, demand_index, dist
+        )
+        dist_b, effort_b = simulate_customers(
+            assignment_b, store, new, item_sizes, item_weight, G, depot, block_capacity, demand_index, dist
+        )
+        differences["Distance"][new] = dist_a - dist_b
+        differences["Effort"][new] = effort_a - effort_b
+
+        labels = strata[sample]
+        n = len(sample)
+        # Half-width shrinks roughly with sqrt(1/n - 1/N)
+        n_max = min(N, max(n, math.ceil(max_fraction * N)))
+        shrink = math.sqrt((1 / n_max - 1 / N) / (1 / n - 1 / N)) if n < N else 0.0
+
+        result = {"rounds": rounds, "customers": n, "fraction": n / N, "confidence": round_confidence}
+        resolved = True
+        futile = False
+        for name in metrics:
+            estimate, (low, high) = stratified_total(
+                differences[name][sample], labels, sampler.sizes, round_confidence
+            )
+            better = "B" if low > 0 else "A" if high < 0 else None
+            if better is None:
+                resolved = False
+                if high > low:
+                    futile = futile or max(abs(low), abs(high)) <= (high - low) / 2 * shrink
+            result[name] = {"difference": estimate, "ci": (low, high), "better": better}
+
+        if resolved:
+            result["stopped"] = "resolved"
+        elif futile:
+            result["stopped"] = "futile"
+        elif fraction >= max_fraction or n == N:
+            result["stopped"] = "no_difference"
+        else:
+            fraction = min(fraction * growth, max_fraction)
+            continue
+        result["resolved"] = resolved
+        return result
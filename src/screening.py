@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+from evaluation import evaluate_solution
+from order_store import as_order_store
+
+
+def nearest_block_distances(block_assignment, items, depot_dist):
+    """
+    Distance from the depot to the closest block of every item (0 if unplaced).
+    """
+    nearest = {}
+    for block, item in block_assignment.items():
+        d = depot_dist.get(block, np.inf)
+        if d < nearest.get(item, np.inf):
+            nearest[item] = d
+    return np.array([nearest.get(i, 0.0) for i in items], dtype=float)
+
+
+def served_block_distances(block_assignment, items, depot_dist, item_amount, item_sizes, block_capacity=60):
+    """
+    Stock-weighted depot distance of every item over a whole season.
+
+    The item's total demand is drained from its blocks nearest to the depot
+    first, each block holding int(block_capacity / size) units, and the
+    distance of every block is weighted by the units it serves. Dividing by
+    the total demand (not the served units) also discounts the lines that go
+    unfilled once all blocks are empty. Unplaced items get 0.
+    """
+    item_blocks = {}
+    for block, item in block_assignment.items():
+        item_blocks.setdefault(item, []).append(depot_dist.get(block, np.inf))
+
+    distances = np.zeros(len(items))
+    for i, item in enumerate(items):
+        if item not in item_blocks:
+            continue
+        size = item_sizes.get(item, 1)
+        stock = int(block_capacity / size) if size > 0 else 0
+        demand = item_amount[i]
+        remaining = demand
+        served = 0.0
+        for d in sorted(item_blocks[item]):
+            if remaining <= 0:
+                break
+            used = min(stock, remaining)
+            served += d * used
+            remaining -= used
+        distances[i] = served / demand if demand > 0 else min(item_blocks[item])
+    return distances
+
+
+def score_layouts(layouts, orders, item_weight, G, depot, item_sizes=None, block_capacity=60,
+                  memory_budget=256 * 2**20):
+    """
+    Depletion-free approximate scoring of many candidate layouts at once.
+
+    Every item gets one distance per layout, so handling effort is a
+    matrix-vector product of the order matrix with the per-item
+    (weight * distance) vector. Walking distance is bracketed per order: the
+    route must at least reach the farthest required block and come back
+    (2 * max), and is never longer than visiting every block on a separate
+    trip (2 * sum).
+
+    With item_sizes, the item distance is the stock-weighted mean over the
+    blocks its season demand drains (served_block_distances), which follows
+    evaluate_solution when blocks run empty. Without it, every item is
+    picked from its block nearest to the depot.
+
+    The OrderStore lines are used directly as a sparse customer x item
+    matrix (CSR). The distance bounds only depend on which items a basket
+    holds, so they are computed once per distinct basket and weighted by
+    its multiplicity.
+
+    The order in which customers drain the blocks is still ignored, so the
+    scores rank layouts, they do not reproduce the exact totals. With the
+    nearest-block distance the rank correlation can drop sharply once
+    blocks run empty.
+
+    Args:
+        layouts (list): Candidate block_assignment dicts on the same graph.
+        orders: OrderStore or orders DataFrame.
+        item_sizes (dict): Item sizes for the stock-weighted distance; None
+            uses the nearest block.
+        memory_budget (int): Approximate bytes for the per-chunk
+            (layouts x basket lines) distance matrix; sets how many layouts
+            are scored at once.
+
+    Returns:
+        pd.DataFrame: One row per layout with Effort, DistanceLower,
+            DistanceUpper and DistanceEstimate (midpoint of the bounds).
+    """
+    store = as_order_store(orders)
+    items = store.items
+    depot_dist = nx.single_source_dijkstra_path_length(G, depot, weight="weight")
+
+    weights = np.array([item_weight.get(i, 0) for i in items], dtype=float)
+    item_amount = store.item_totals().astype(float)
+
+    representatives, multiplicities = store.unique_baskets()
+    baskets = store.take(representatives)
+    indices = baskets.item_idx
+    row_starts = baskets.indptr[:-1]
+
+    chunk_size = max(1, int(memory_budget // (8 * max(len(indices), 1))))
+
+    rows = []
+    for start in range(0, len(layouts), chunk_size):
+        chunk = layouts[start:start + chunk_size]
+        if item_sizes is None:
+            D = np.vstack([nearest_block_distances(a, items, depot_dist) for a in chunk])
+        else:
+            D = np.vstack([
+                served_block_distances(a, items, depot_dist, item_amount, item_sizes, block_capacity)
+                for a in chunk
+            ])
+
+        effort = D @ (weights * item_amount)
+        per_line = D[:, indices]
+        lower = 2 * np.maximum.reduceat(per_line, row_starts, axis=1) @ multiplicities
+        upper = 2 * np.add.reduceat(per_line, row_starts, axis=1) @ multiplicities
+        rows.append(np.column_stack((effort, lower, upper)))
+
+    scores = pd.DataFrame(
+        np.vstack(rows) if rows else np.empty((0, 3)),
+        columns=["Effort", "DistanceLower", "DistanceUpper"]
+    )
+    scores["DistanceEstimate"] = (scores["DistanceLower"] + scores["DistanceUpper"]) / 2
+    return scores
+
+
+def spearman(a, b):
+    """Spearman rank correlation (average ranks for ties)."""
+    ra = pd.Series(a, dtype=float).rank().to_numpy()
+    rb = pd.Series(b, dtype=float).rank().to_numpy()
+    if len(ra) < 2 or ra.std() == 0 or rb.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def rank_agreement(layouts, orders, item_sizes, item_weight, item_total_demand, G, depot, block_capacity=60):
+    """
+    Compares the fast scorer against evaluate_solution on the same layouts.
+
+    Returns:
+        tuple: (scores, correlation)
+            scores (pd.DataFrame): score_layouts output plus the exact
+                ExactDistance and ExactEffort columns.
+            correlation (dict): Spearman correlation of Effort and
+                DistanceEstimate with their exact counterparts.
+    """
+    store = as_order_store(orders)
+    scores = score_layouts(layouts, store, item_weight, G, depot, item_sizes, block_capacity)
+
+    exact = [
+        evaluate_solution(a, store, item_sizes, item_weight, item_total_demand, G, depot, block_capacity)[:2]
+        for a in layouts
+    ]
+    scores["ExactDistance"] = [d for d, _ in exact]
+    scores["ExactEffort"] = [e for _, e in exact]
+
+    correlation = {
+        "Effort": spearman(scores["Effort"], scores["ExactEffort"]),
+        "Distance": spearman(scores["DistanceEstimate"], scores["ExactDistance"]),
+    }
+    return scores, correlation
@@ -0,0 +1,213 @@
+import heapq
+import pandas as pd
+from collections import defaultdict
+from evaluation import make_distance_lookup, initial_block_inventory, pick_order, nearest_neighbor_route
+
+
+def stream_order_rows(orders_path, time_col="Timestamp", chunksize=100_000):
+    """
+    Lazily reads a time-ordered order CSV.
+
+    Yields:
+        tuple: (timestamp, CustomerID, ItemID, Amount) per order line.
+    """
+    columns = [time_col, "CustomerID", "ItemID", "Amount"]
+    for chunk in pd.read_csv(orders_path, usecols=columns, chunksize=chunksize):
+        chunk[time_col] = pd.to_datetime(chunk[time_col])
+        yield from chunk[columns].itertuples(index=False, name=None)
+
+
+def group_orders(rows):
+    """
+    Collapses the lines with the same timestamp and customer into one order.
+
+    Rows must be in time order, but the lines of one order do not have to be
+    adjacent: within each timestamp, lines are grouped per customer and the
+    orders are emitted in the order their customers first appear.
+
+    Yields:
+        tuple: (timestamp, CustomerID, {ItemID: Amount})
+    """
+    current_ts = None
+    baskets = {}
+    for ts, cust, item, amount in rows:
+        if ts != current_ts:
+            for basket_cust, item_amounts in baskets.items():
+                yield current_ts, basket_cust, dict(item_amounts)
+            current_ts = ts
+            baskets = {}
+        if cust not in baskets:
+            baskets[cust] = defaultdict(int)
+        baskets[cust][item] += amount
+    for basket_cust, item_amounts in baskets.items():
+        yield current_ts, basket_cust, dict(item_amounts)
+
+
+def stream_orders(orders_path, time_col="Timestamp", chunksize=100_000):
+    """Streams grouped orders from a time-ordered order CSV."""
+    return group_orders(stream_order_rows(orders_path, time_col, chunksize))
+
+
+def stream_replenishments(replenishment_path, time_col="Timestamp", chunksize=100_000):
+    """
+    Lazily reads a time-ordered replenishment CSV.
+
+    The file has a timestamp column, either a BlockID or an ItemID column
+    and an Amount column. Rows without a target are skipped.
+
+    Yields:
+        tuple: (timestamp, ("block", BlockID) or ("item", ItemID), Amount)
+    """
+    for chunk in pd.read_csv(replenishment_path, chunksize=chunksize):
+        target_col, kind = ("BlockID", "block") if "BlockID" in chunk.columns else ("ItemID", "item")
+        chunk = chunk[chunk[target_col].notna() & (chunk[target_col].astype(str).str.strip() != "")]
+        chunk[time_col] = pd.to_datetime(chunk[time_col])
+        for ts, target, amount in chunk[[time_col, target_col, "Amount"]].itertuples(index=False, name=None):
+            yield ts, (kind, target), amount
+
+
+def simulate_season(order_stream, block_assignment, item_sizes, item_weight, G, depot, block_capacity=60,
+                    reorder_points=None, lead_time="0h", replenishment_stream=None, window="1D"):
+    """
+    Replays a timestamped order stream against the layout with restocking.
+
+    Unlike evaluate_solution, blocks are refilled over time: either by
+    reorder-point rules (a block whose stock falls to its item's reorder
+    point is refilled to full after lead_time) or by explicit events from
+    replenishment_stream (a block ID is refilled directly, an item ID is
+    spread over that item's blocks nearest to the depot first, up to full).
+    Both streams are consumed lazily, so memory does not grow with history.
+    Refills are counted in the window in which they happen; windows without
+    orders are still emitted, and refills due after the last order are
+    flushed at the end. Order lines for items without a block count as
+    stock-outs.
+
+    Args:
+        order_stream (iterable): (timestamp, CustomerID, {ItemID: Amount}) in time order.
+        reorder_points (dict or number): Item -> units per block that triggers
+            a refill, or one value for all items. None disables the rules.
+        lead_time (str or pd.Timedelta): Delay between trigger and refill.
+        replenishment_stream (iterable): (timestamp, (kind, target), Amount) in time
+            order, kind being "block" or "item" (see stream_replenishments).
+        window (str or pd.Timedelta): Fixed-length window used to bucket the metrics.
+
+    Yields:
+        dict: Metrics of each consecutive time window.
+    """
+    dist = make_distance_lookup(G)
+    lead_time = pd.Timedelta(lead_time)
+    full_inventory = initial_block_inventory(block_assignment, item_sizes, block_capacity)
+    inventory = full_inventory.copy()
+
+    item_to_blocklist = defaultdict(list)
+    for block, item in block_assignment.items():
+        item_to_blocklist[item].append(block)
+
+    def reorder_point(item):
+        if isinstance(reorder_points, dict):
+            return reorder_points.get(item)
+        return reorder_points
+
+    pending = []  # heap of (due time, block) for rule-triggered refills
+    pending_blocks = set()
+    replenishments = iter(replenishment_stream) if replenishment_stream is not None else iter(())
+    next_replenishment = next(replenishments, None)
+
+    def new_window(start):
+        return {
+            "Window": start,
+            "Orders": 0,
+            "Distance": 0,
+            "Effort": 0,
+            "StockoutLines": 0,
+            "StockoutUnits": 0,
+            "ReplenishmentTrips": 0,
+            "UnitsReplenished": 0,
+        }
+
+    def refill(block, amount, metrics):
+        added = min(amount, full_inventory[block] - inventory[block])
+        if added > 0:
+            inventory[block] += added
+            metrics["UnitsReplenished"] += added
+        return added
+
+    def apply_replenishments(until, metrics, inclusive=True):
+        """Applies every refill due before until (or at until, if inclusive)."""
+        nonlocal next_replenishment
+        while pending and (pending[0][0] < until or inclusive and pending[0][0] == until):
+            _, block = heapq.heappop(pending)
+            pending_blocks.discard(block)
+            refill(block, full_inventory[block], metrics)
+            metrics["ReplenishmentTrips"] += 1
+
+        while next_replenishment is not None and (
+            next_replenishment[0] < until or inclusive and next_replenishment[0] == until
+        ):
+            _, (kind, target), amount = next_replenishment
+            if kind == "block":
+                if target in inventory:
+                    refill(target, amount, metrics)
+            else:
+                for block in sorted(item_to_blocklist.get(target, []), key=lambda b: dist(depot, b)):
+                    if amount <= 0:
+                        break
+                    amount -= refill(block, amount, metrics)
+            metrics["ReplenishmentTrips"] += 1
+            next_replenishment = next(replenishments, None)
+
+    orders = iter(order_stream)
+    next_order = next(orders, None)
+    first_events = [e[0] for e in (next_order, next_replenishment) if e is not None]
+    if not first_events:
+        return
+
+    window_length = pd.Timedelta(window)
+    window_start = pd.Timestamp(min(first_events)).floor(window_length)
+    window_end = window_start + window_length
+    metrics = new_window(window_start)
+
+    def close_windows_until(t):
+        """Closes every window that ends at or before t, applying its refills first."""
+        nonlocal metrics, window_end
+        while t >= window_end:
+            apply_replenishments(window_end, metrics, inclusive=False)
+            yield metrics
+            metrics = new_window(window_end)
+            window_end += window_length
+
+    while next_order is not None:
+        ts, cust, item_amounts = next_order
+        if ts >= window_end:
+            yield from close_windows_until(ts)
+        if pending or next_replenishment is not None:
+            apply_replenishments(ts, metrics)
+
+        blocks_visited, effort, unfilled = pick_order(
+            item_amounts, item_to_blocklist, inventory, item_weight, dist, depot
+        )
+        _, distance = nearest_neighbor_route(blocks_visited, dist, depot)
+
+        metrics["Orders"] += 1
+        metrics["Distance"] += distance
+        metrics["Effort"] += effort
+        metrics["StockoutLines"] += len(unfilled)
+        metrics["StockoutUnits"] += sum(unfilled.values())
+
+        if reorder_points is not None:
+            for block in set(blocks_visited):
+                rp = reorder_point(block_assignment[block])
+                if rp is not None and inventory[block] <= rp and block not in pending_blocks:
+                    heapq.heappush(pending, (ts + lead_time, block))
+                    pending_blocks.add(block)
+
+        next_order = next(orders, None)
+
+    # Flush refills that fall after the last order
+    while pending or next_replenishment is not None:
+        due_times = [e[0] for e in (pending[0] if pending else None, next_replenishment) if e is not None]
+        next_time = min(due_times)
+        yield from close_windows_until(next_time)
+        apply_replenishments(next_time, metrics)
+
+    yield metrics
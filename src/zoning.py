@@ -0,0 +1,230 @@
+import time
+import networkx as nx
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from algorithm import place_items_by_lsc
+from evaluation import evaluate_solution
+from order_store import as_order_store
+
+
+def partition_layout(G, blocks, depot, n_zones, seed=None):
+    """
+    Splits the storage blocks into up to n_zones contiguous zones.
+
+    The layout graph (without the depot) is bisected recursively with
+    Kernighan-Lin, always splitting the zone that holds the most blocks.
+    Zones are returned ordered by their mean distance to the depot.
+    """
+    depot_dist = nx.single_source_dijkstra_path_length(G, depot, weight="weight")
+    block_set = set(blocks)
+    H = G.subgraph(n for n in G if n != depot)
+
+    parts = [set(H.nodes)]
+    while len(parts) < n_zones:
+        parts.sort(key=lambda p: len(p & block_set))
+        largest = parts[-1]
+        if len(largest & block_set) < 2:
+            break
+        left, right = nx.community.kernighan_lin_bisection(H.subgraph(largest), weight="weight", seed=seed)
+        if not (left & block_set) or not (right & block_set):
+            break
+        parts = parts[:-1] + [left, right]
+
+    # Keep the original block order inside each zone
+    zones = [[b for b in blocks if b in part] for part in parts]
+    zones = [z for z in zones if z]
+    zones.sort(key=lambda z: sum(depot_dist.get(b, 0) for b in z) / len(z))
+    return zones
+
+
+def cluster_items(items, cooc, k_values, max_cluster_blocks, seed=None):
+    """
+    Groups items that are frequently ordered together.
+
+    Louvain communities of the co-occurrence graph are used as the initial
+    clusters; any cluster needing more than max_cluster_blocks blocks is cut
+    into chunks, keeping the most strongly connected items together.
+    """
+    C = nx.Graph()
+    storable = [i for i in items if k_values.get(i, 0) > 0]
+    C.add_nodes_from(storable)
+    for (i, j), co in cooc.items():
+        if co > 0 and i in C and j in C and i != j:
+            C.add_edge(i, j, weight=co)
+
+    clusters = []
+    for community in nx.community.louvain_communities(C, weight="weight", seed=seed):
+        members = sorted(
+            community,
+            key=lambda i: sum(C[i][j]["weight"] for j in C[i] if j in community),
+            reverse=True,
+        )
+        chunk, chunk_blocks = [], 0
+        for item in members:
+            if chunk and chunk_blocks + k_values[item] > max_cluster_blocks:
+                clusters.append(chunk)
+                chunk, chunk_blocks = [], 0
+            chunk.append(item)
+            chunk_blocks += k_values[item]
+        if chunk:
+            clusters.append(chunk)
+    return clusters
+
+
+def assign_clusters_to_zones(clusters, zones, demand, weight, k_values):
+    """
+    Distributes item clusters over zones (zones must be ordered nearest first).
+
+    Clusters with the highest demand-weight per block go to the nearest zone
+    that can hold the whole cluster. When no zone can, the cluster's items are
+    spilled into the nearest zones with free blocks, splitting an item's
+    blocks across zones if necessary.
+
+    Returns:
+        list: One dict per zone mapping item -> number of blocks in that zone.
+    """
+    remaining = [len(z) for z in zones]
+    zone_k = [defaultdict(int) for _ in zones]
+
+    def intensity(group):
+        blocks_needed = sum(k_values[i] for i in group)
+        load = sum(demand.get(i, 0) * weight.get(i, 0) for i in group)
+        return load / blocks_needed if blocks_needed else 0
+
+    for cluster in sorted(clusters, key=intensity, reverse=True):
+        cluster_blocks = sum(k_values[i] for i in cluster)
+        target = next((z for z, free in enumerate(remaining) if free >= cluster_blocks), None)
+
+        for item in sorted(cluster, key=lambda i: intensity([i]), reverse=True):
+            needed = k_values[item]
+            order = range(len(zones)) if target is None else [target] + [z for z in range(len(zones)) if z != target]
+            for z in order:
+                if needed <= 0:
+                    break
+                take = min(needed, remaining[z])
+                if take <= 0:
+                    continue
+                zone_k[z][item] += take
+                remaining[z] -= take
+                needed -= take
+            if needed > 0:
+                print(f"Warning: No free blocks left for {needed} block(s) of item {item}!")
+
+    return [dict(zk) for zk in zone_k]
+
+
+def _place_zone(task):
+    """Runs the PPS + LCS placement for a single zone (executed in a worker process)."""
+    zone_items, zone_k, zone_blocks, demand, weight, cooc, G, depot, pps_weights, lsc_weights = task
+    block_assignment, placed_blocks = place_items_by_lsc(
+        items=zone_items,
+        demand=demand,
+        weight=weight,
+        k_values=zone_k,
+        cooc=cooc,
+        G=G,
+        blocks=zone_blocks,
+        depot=depot,
+        pps_weights=pps_weights,
+        lsc_weights=lsc_weights
+    )
+    return block_assignment, dict(placed_blocks)
+
+
+def place_items_by_zone(items, demand, weight, k_values, cooc, G, blocks, depot, n_zones=2,
+                        pps_weights=None, lsc_weights=None, max_workers=None, seed=None):
+    """
+    Zone-decomposed variant of place_items_by_lsc for large warehouses.
+
+    The layout is partitioned into zones, co-occurring items are clustered and
+    assigned to zones, then every zone runs the greedy PPS + LCS placement in
+    its own process. The per-zone results are merged into a single
+    block_assignment, so the return value matches place_items_by_lsc.
+    """
+    zones = partition_layout(G, blocks, depot, n_zones, seed=seed)
+    clusters = cluster_items(items, cooc, k_values, max(len(z) for z in zones), seed=seed)
+    zone_k = assign_clusters_to_zones(clusters, zones, demand, weight, k_values)
+
+    tasks = []
+    for zone_blocks, zk in zip(zones, zone_k):
+        if not zk:
+            continue
+        zone_items = [i for i in items if i in zk]
+        zone_cooc = {(i, j): co for (i, j), co in cooc.items() if i in zk and j in zk}
+        tasks.append((
+            zone_items,
+            zk,
+            zone_blocks,
+            {i: demand[i] for i in zone_items},
+            {i: weight[i] for i in zone_items},
+            zone_cooc,
+            G,
+            depot,
+            pps_weights,
+            lsc_weights,
+        ))
+
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_place_zone(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_place_zone, tasks))
+
+    block_assignment = {}
+    placed_blocks = defaultdict(list)
+    for zone_assignment, zone_placed in results:
+        block_assignment.update(zone_assignment)
+        for item, item_blocks in zone_placed.items():
+            placed_blocks[item].extend(item_blocks)
+    return block_assignment, placed_blocks
+
+
+def compare_with_monolithic(items, demand, weight, k_values, cooc, G, blocks, depot,
+                            orders, item_sizes, item_total_inventory, block_capacity=60,
+                            n_zones=2, pps_weights=None, lsc_weights=None, max_workers=None, seed=None):
+    """
+    Runs both the monolithic and the zoned placement and measures the trade-off.
+
+    Returns:
+        dict: Runtimes, speedup, evaluated metrics of both layouts and the
+            relative quality gap (positive = zoned layout is worse).
+    """
+    store = as_order_store(orders)
+    placement_args = dict(
+        items=items, demand=demand, weight=weight, k_values=k_values, cooc=cooc,
+        G=G, blocks=blocks, depot=depot, pps_weights=pps_weights, lsc_weights=lsc_weights
+    )
+
+    start = time.perf_counter()
+    mono_assignment, _ = place_items_by_lsc(**placement_args)
+    mono_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    zoned_assignment, _ = place_items_by_zone(
+        **placement_args, n_zones=n_zones, max_workers=max_workers, seed=seed
+    )
+    zoned_time = time.perf_counter() - start
+
+    def score(assignment):
+        total_dist, effort, *_ = evaluate_solution(
+            assignment, store, item_sizes, weight, item_total_inventory, G, depot, block_capacity
+        )
+        return total_dist, effort
+
+    mono_dist, mono_effort = score(mono_assignment)
+    zoned_dist, zoned_effort = score(zoned_assignment)
+
+    def gap(zoned, mono):
+        return (zoned - mono) / mono if mono else 0.0
+
+    return {
+        "monolithic_time": mono_time,
+        "zoned_time": zoned_time,
+        "speedup": mono_time / zoned_time if zoned_time else float("inf"),
+        "monolithic_distance": mono_dist,
+        "zoned_distance": zoned_dist,
+        "distance_gap": gap(zoned_dist, mono_dist),
+        "monolithic_effort": mono_effort,
+        "zoned_effort": zoned_effort,
+        "effort_gap": gap(zoned_effort, mono_effort),
+    }